@@ -2,8 +2,46 @@
 Document processing agent - extracts text from various file formats
 """
 import os
-from PyPDF2 import PdfReader
-from docx import Document
+
+# PDF/DOCX parsers are only needed when a document of that type is
+# uploaded; importing them lazily keeps worker startup (and redeploy
+# cold starts) fast
+_pdf_reader_cls = None
+_docx_document_cls = None
+
+def _get_pdf_reader():
+    """Import PyPDF2's PdfReader on first use"""
+    global _pdf_reader_cls
+    if _pdf_reader_cls is None:
+        from PyPDF2 import PdfReader
+        _pdf_reader_cls = PdfReader
+    return _pdf_reader_cls
+
+def _get_docx_document():
+    """Import python-docx's Document on first use"""
+    global _docx_document_cls
+    if _docx_document_cls is None:
+        from docx import Document
+        _docx_document_cls = Document
+    return _docx_document_cls
+
+# PyMuPDF extracts text in native code, roughly an order of magnitude
+# faster than PyPDF2 on large documents; PyPDF2 stays as the fallback
+# when it isn't installed
+_pymupdf = None
+_pymupdf_checked = False
+
+def _get_pymupdf():
+    """Import PyMuPDF on first use, or None if unavailable"""
+    global _pymupdf, _pymupdf_checked
+    if not _pymupdf_checked:
+        _pymupdf_checked = True
+        try:
+            import fitz
+            _pymupdf = fitz
+        except ImportError:
+            _pymupdf = None
+    return _pymupdf
 
 class DocumentProcessor:
     """Agent responsible for extracting text from documents"""
@@ -35,11 +73,61 @@ class DocumentProcessor:
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
     
+    def extract_text_from_stream(self, stream, filename: str) -> str:
+        """
+        Extract text from an in-memory file stream based on file extension
+
+        Avoids the disk round-trip for small uploads; the PDF and DOCX
+        readers both accept file-like objects directly.
+
+        Args:
+            stream: File-like object positioned at the start of the data
+            filename: Original filename (used for extension detection)
+
+        Returns:
+            Extracted text content
+        """
+        file_ext = os.path.splitext(filename)[1].lower()
+
+        if file_ext == '.pdf':
+            try:
+                mupdf = _get_pymupdf()
+                if mupdf is not None:
+                    with mupdf.open(stream=stream.read(), filetype='pdf') as doc:
+                        return "\n".join(page.get_text("text") for page in doc).strip()
+                reader = _get_pdf_reader()(stream)
+                text = ""
+                for page in reader.pages:
+                    text += page.extract_text() + "\n"
+                return text.strip()
+            except Exception as e:
+                raise RuntimeError(f"Error extracting PDF: {str(e)}")
+        elif file_ext == '.docx':
+            try:
+                doc = _get_docx_document()(stream)
+                text = ""
+                for paragraph in doc.paragraphs:
+                    text += paragraph.text + "\n"
+                return text.strip()
+            except Exception as e:
+                raise RuntimeError(f"Error extracting DOCX: {str(e)}")
+        elif file_ext == '.txt':
+            try:
+                return stream.read().decode('utf-8').strip()
+            except Exception as e:
+                raise RuntimeError(f"Error extracting TXT: {str(e)}")
+        else:
+            raise ValueError(f"Unsupported file format: {file_ext}")
+
     def _extract_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file"""
         try:
+            mupdf = _get_pymupdf()
+            if mupdf is not None:
+                with mupdf.open(file_path) as doc:
+                    return "\n".join(page.get_text("text") for page in doc).strip()
             with open(file_path, 'rb') as file:
-                reader = PdfReader(file)
+                reader = _get_pdf_reader()(file)
                 text = ""
                 for page in reader.pages:
                     text += page.extract_text() + "\n"
@@ -50,7 +138,7 @@ class DocumentProcessor:
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
         try:
-            doc = Document(file_path)
+            doc = _get_docx_document()(file_path)
             text = ""
             for paragraph in doc.paragraphs:
                 text += paragraph.text + "\n"
@@ -1,4 +1,7 @@
 import os
+import time
+import threading
+from concurrent.futures import Future
 from typing import List, Optional
 from .openai_client import get_openai_client
 
@@ -8,15 +11,22 @@ class Embedder:
     def __init__(self):
         self.client = get_openai_client()
         self.model = os.getenv('OPENAI_EMBED_MODEL', 'text-embedding-3-large')
+        # Short memo of recent single-text embeddings: callers that embed
+        # the same text twice in one request (semantic cache + search)
+        # pay for one API call
+        self._recent = {}
+        self._recent_order = []
+        self._recent_max = 256
+        self._recent_lock = threading.Lock()
         print(f"✅ Embedder initialized with model: {self.model}")
-    
+
     def create_embedding(self, text: str) -> Optional[List[float]]:
         """
         Create embedding for a single text
-        
+
         Args:
             text (str): Text to embed
-            
+
         Returns:
             Optional[List[float]]: Embedding vector or None if failed
         """
@@ -24,22 +34,34 @@ class Embedder:
             if not text or len(text.strip()) == 0:
                 print("⚠️  Empty text provided for embedding")
                 return None
-            
+
             # Clean text
             text = text.strip()
-            
+
+            with self._recent_lock:
+                cached = self._recent.get(text)
+            if cached is not None:
+                return cached
+
             # Create embedding
             response = self.client.embeddings.create(
                 model=self.model,
                 input=text
             )
-            
+
             # Extract embedding
             embedding = response.data[0].embedding
-            
+
+            with self._recent_lock:
+                if text not in self._recent:
+                    self._recent[text] = embedding
+                    self._recent_order.append(text)
+                    while len(self._recent_order) > self._recent_max:
+                        self._recent.pop(self._recent_order.pop(0), None)
+
             print(f"✅ Created embedding for text ({len(text)} chars) -> {len(embedding)} dims")
             return embedding
-            
+
         except Exception as e:
             print(f"❌ Error creating embedding: {e}")
             return None
@@ -91,3 +113,76 @@ class Embedder:
         except Exception as e:
             print(f"❌ Error creating batch embeddings: {e}")
             return [None] * len(texts)
+
+
+class EmbedderBatcher:
+    """Micro-batcher that coalesces embedding requests across uploads
+
+    Concurrent uploads each embed their chunks independently, which costs
+    one API round-trip per upload. The batcher collects chunk lists that
+    arrive within a short window and sends them as a single embeddings
+    call, splitting the results back to the waiting callers.
+    """
+
+    def __init__(self, embedder: 'Embedder', window_ms: int = 50, max_chunks: int = 128):
+        self.embedder = embedder
+        self.window = window_ms / 1000.0
+        self.max_chunks = max_chunks
+        self._pending = []  # list of (texts, Future)
+        self._pending_chunks = 0
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._drain_loop, daemon=True)
+        self._worker.start()
+
+    def embed_many(self, texts: List[str], timeout: float = 120) -> List[Optional[List[float]]]:
+        """Embed a list of texts, coalescing with other in-flight requests"""
+        if not texts:
+            return []
+        future = Future()
+        with self._cond:
+            self._pending.append((texts, future))
+            self._pending_chunks += len(texts)
+            self._cond.notify()
+        return future.result(timeout=timeout)
+
+    def _drain_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # Hold the batch open briefly so near-simultaneous uploads
+                # land in the same API call
+                deadline = time.monotonic() + self.window
+                while self._pending_chunks < self.max_chunks:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending
+                self._pending = []
+                self._pending_chunks = 0
+
+            flat = [text for texts, _ in batch for text in texts]
+            if len(batch) > 1:
+                print(f"🧺 Coalesced {len(batch)} embedding requests ({len(flat)} chunks)")
+            embeddings = self.embedder.create_embeddings_batch(flat)
+
+            offset = 0
+            for texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(texts)])
+                offset += len(texts)
+
+
+# Shared batcher instance - created lazily so importing this module
+# doesn't start a thread or require API credentials
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_embed_batcher(embedder: 'Embedder') -> EmbedderBatcher:
+    """Return the process-wide embedding micro-batcher"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbedderBatcher(embedder)
+    return _batcher
@@ -1,16 +1,73 @@
 import os
+import threading
 from openai import OpenAI
 
+# httpx ships with the openai package; used to size the shared pool
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Process-wide client: every agent shares one HTTP connection pool, so
+# concurrent requests reuse warm TLS connections to api.openai.com
+# instead of each agent paying its own handshake
+_client = None
+_client_lock = threading.Lock()
+
 def get_openai_client():
     """
-    Get configured OpenAI client
-    
+    Get the shared OpenAI client (created once per process)
+
     Returns:
         OpenAI: Configured OpenAI client instance
     """
-    api_key = os.getenv('OPENAI_API_KEY')
-    
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable is not set")
-    
-    return OpenAI(api_key=api_key)
\ No newline at end of file
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv('OPENAI_API_KEY')
+
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY environment variable is not set")
+
+                if httpx is not None:
+                    http_client = httpx.Client(
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                        timeout=60,
+                    )
+                    _client = OpenAI(api_key=api_key, http_client=http_client)
+                else:
+                    _client = OpenAI(api_key=api_key)
+
+    return _client
+
+# Pre-warming must happen per process, never in the preloading gunicorn
+# master: a TLS socket primed before fork is inherited into every worker's
+# copy of the pool, and two workers reusing "their" idle connection would
+# interleave writes on one fd. Each forked worker warms its own pool via
+# the at-fork hook; processes that never fork (dev server) just pay the
+# handshake on their first real request.
+_warmed_pid = None
+
+def _ensure_warmed():
+    """Prime TCP+TLS once per process so the first request skips the handshake"""
+    global _warmed_pid
+    if _client is None or _warmed_pid == os.getpid():
+        return
+    with _client_lock:
+        if _warmed_pid == os.getpid():
+            return
+        _warmed_pid = os.getpid()
+    threading.Thread(target=_warm_connection, daemon=True).start()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_ensure_warmed)
+
+def _warm_connection():
+    """Open a connection to the API so later calls reuse it"""
+    try:
+        _client.models.list()
+        print("✅ OpenAI connection pool pre-warmed")
+    except Exception as e:
+        print(f"⚠️  OpenAI connection pre-warm failed: {e}")
@@ -1,10 +1,14 @@
 import os
 import uuid
+import logging
 from datetime import datetime
-from openai import OpenAI
 from typing import List, Dict, Any
 import re
+from .openai_client import get_openai_client
 from .vector_store import VectorStore
+from .embeddings import get_embed_batcher
+
+logger = logging.getLogger(__name__)
 
 class QAAgent:
     """Agent responsible for question answering using RAG approach"""
@@ -12,13 +16,21 @@ class QAAgent:
     def __init__(self, session_id: str = None, user_id: str = None):
         """Initialize the QA Agent with optional session-based isolation and user identification"""
         try:
-            self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.client = get_openai_client()
             self.model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
             self.session_id = session_id
             self.user_id = user_id
             
             # Storage for documents and their metadata
             self.documents = []  # List of {'text': str, 'title': str, 'chunks': List[str]}
+
+            # Cached get_status() result, invalidated whenever documents change
+            self._status_cache = None
+            self._status_dirty = True
+
+            # Content hashes already ingested through this agent - identical
+            # re-uploads short-circuit instead of re-chunking and re-embedding
+            self._ingested_hashes = set()
             
             # Initialize vector store for embeddings with session-specific path
             if session_id:
@@ -36,14 +48,16 @@ class QAAgent:
             print(f"❌ Error initializing QAAgent: {e}")
             raise
     
-    def add_document(self, text: str, title: str = "Document") -> bool:
+    def add_document(self, text: str, title: str = "Document", doc_hash: str = None) -> bool:
         """
         Add a document to the knowledge base (supports multiple documents with user isolation)
-        
+
         Args:
             text (str): Document text
             title (str): Document title
-            
+            doc_hash (str): Optional content hash - a re-upload of already
+                ingested content for this user no-ops and reports success
+
         Returns:
             bool: Success status
         """
@@ -51,6 +65,11 @@ class QAAgent:
             if not text or len(text.strip()) < 10:
                 print("⚠️  Document too short to add")
                 return False
+
+            dedup_key = (self.user_id, doc_hash) if doc_hash else None
+            if dedup_key and dedup_key in self._ingested_hashes:
+                print(f"♻️  Document '{title}' already ingested (hash match) - skipping re-embed")
+                return True
             
             # For multi-user isolation, load existing data first
             if not hasattr(self.vector_store, 'vectors') or not self.vector_store.vectors:
@@ -69,7 +88,7 @@ class QAAgent:
                 return False
             
             # Generate unique document ID
-            doc_id = str(uuid.uuid4())
+            doc_id = uuid.uuid4().hex  # no dashes: smaller persisted metadata
             upload_time = datetime.now().isoformat()
             
             # Store document with user information
@@ -83,8 +102,12 @@ class QAAgent:
             }
             self.documents.append(document)
             
+            # Embed all chunks through the shared micro-batcher: one API
+            # call for this document, coalesced with any concurrent uploads
+            embeddings = get_embed_batcher(self.vector_store.embedder).embed_many(chunks)
+
             # Add chunks to vector store with user metadata
-            for chunk_index, chunk in enumerate(chunks):
+            for chunk_index, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
                 metadata = {
                     'user_id': self.user_id,
                     'doc_id': doc_id,
@@ -94,11 +117,16 @@ class QAAgent:
                     'upload_time': upload_time,
                     'text': chunk  # Store full chunk text for context reconstruction
                 }
-                self.vector_store.add_text(chunk, metadata)
+                self.vector_store.add_text(chunk, metadata, embedding=embedding)
             
             # Save vector store
             self.vector_store.save()
-            
+
+            # Invalidate cached status now that documents changed
+            self._status_dirty = True
+            if dedup_key:
+                self._ingested_hashes.add(dedup_key)
+
             user_doc_count = self._count_user_documents()
             print(f"✅ Added document '{title}' with {len(chunks)} chunks for user {self.user_id}")
             print(f"👤 User now has {user_doc_count} documents in vector store")
@@ -126,9 +154,8 @@ class QAAgent:
             if not self.vector_store.vectors:
                 return "No documents have been uploaded yet. Please upload a document first, then ask your question."
             
-            print(f"❓ Processing question: {question}")
-            print(f"📚 Available documents: {len(self.documents)}")
-            print(f"📄 Available chunks: {len(self.vector_store.vectors)}")
+            logger.debug("Processing question: %s", question)
+            logger.debug("Available documents: %d, chunks: %d", len(self.documents), len(self.vector_store.vectors))
             
             # Get relevant context
             relevant_context = self._get_relevant_context(question)
@@ -139,7 +166,7 @@ class QAAgent:
             # Generate answer using OpenAI
             answer = self._generate_answer(question, relevant_context)
             
-            print(f"✅ Generated answer for question")
+            logger.debug("Generated answer for question")
             return answer
             
         except Exception as e:
@@ -171,28 +198,31 @@ class QAAgent:
         
         chunks = []
         start = 0
-        
-        while start < len(text):
+        text_len = len(text)
+
+        while start < text_len:
             end = start + chunk_size
-            
-            # Try to break at sentence boundary
-            if end < len(text):
-                # Look for sentence ending within last 100 chars
-                for i in range(min(100, chunk_size)):
-                    if text[end - i - 1] in '.!?':
-                        end = end - i
-                        break
-            
+
+            # Try to break at sentence boundary: str.rfind scans the last
+            # 100 chars at C speed instead of a Python char-by-char loop
+            if end < text_len:
+                window_start = end - min(100, chunk_size)
+                cut = max(text.rfind('.', window_start, end),
+                          text.rfind('!', window_start, end),
+                          text.rfind('?', window_start, end))
+                if cut != -1:
+                    end = cut + 1
+
             chunk = text[start:end].strip()
             if chunk:
                 chunks.append(chunk)
-            
+
             start = end - overlap
-            
+
             # Prevent infinite loop
-            if start >= len(text):
+            if start >= text_len:
                 break
-        
+
         return chunks
     
     def _get_vector_stats(self):
@@ -212,13 +242,12 @@ class QAAgent:
             str: Combined relevant context
         """
         try:
-            print(f"🔍 Getting context for: '{question}'")
-            print(f"📋 In-memory documents: {len(self.documents)}")
-            print(f"📄 Vector store chunks: {len(self.vector_store.vectors) if hasattr(self.vector_store, 'vectors') else 0}")
+            logger.debug("Getting context for: %r", question)
+            logger.debug("In-memory documents: %d, vector store chunks: %d", len(self.documents), len(self.vector_store.vectors) if hasattr(self.vector_store, 'vectors') else 0)
             
             # Use vector store data directly if in-memory documents are empty
             if not self.documents and hasattr(self.vector_store, 'metadata') and self.vector_store.metadata:
-                print("🔄 Using vector store data since in-memory documents are empty")
+                logger.debug("Using vector store data since in-memory documents are empty")
                 
                 # Group chunks by document
                 doc_chunks = {}
@@ -237,7 +266,7 @@ class QAAgent:
                         context_parts.append(f"Document: {doc_title}\n{full_text}")
                     
                     context = "\n\n---\n\n".join(context_parts)
-                    print(f"✅ Returning context from vector store: {len(context)} characters from {len(doc_chunks)} documents")
+                    logger.debug("Returning context from vector store: %d characters from %d documents", len(context), len(doc_chunks))
                     return context
             
             # Fallback to in-memory documents if available
@@ -249,7 +278,7 @@ class QAAgent:
                 
                 if context_parts:
                     context = "\n\n---\n\n".join(context_parts)
-                    print(f"✅ Returning context from memory: {len(context)} characters from {len(context_parts)} documents")
+                    logger.debug("Returning context from memory: %d characters from %d documents", len(context), len(context_parts))
                     return context
             
             print("❌ No documents available in memory or vector store")
@@ -360,17 +389,8 @@ class QAAgent:
             return []
     
     
-    def _generate_answer(self, question: str, context: str) -> str:
-        """
-        Generate answer using OpenAI with the provided context
-        
-        Args:
-            question (str): User question
-            context (str): Relevant context
-            
-        Returns:
-            str: Generated answer
-        """
+    def _answer_messages(self, question: str, context: str) -> List[Dict[str, str]]:
+        """Build the chat messages shared by the blocking and streaming paths"""
         system_prompt = """You are a helpful AI assistant that answers questions based on provided context.
 
 Instructions:
@@ -380,11 +400,6 @@ Instructions:
 4. Be direct and specific - don't say "the context doesn't specify" if the information is there
 5. Only say information is not available if it truly cannot be found in the context"""
 
-        print(f"🔍 ANSWER GENERATION DEBUG:")
-        print(f"  📝 Context length: {len(context)} characters")
-        print(f"  🎯 Question: {question}")
-        print(f"  📄 Context preview: {context[:500]}...")
-        
         user_prompt = f"""Context:
 {context}
 
@@ -392,42 +407,85 @@ Question: {question}
 
 Please answer the question based on the context provided above."""
 
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _generate_answer(self, question: str, context: str) -> str:
+        """
+        Generate answer using OpenAI with the provided context
+
+        Args:
+            question (str): User question
+            context (str): Relevant context
+
+        Returns:
+            str: Generated answer
+        """
+        logger.debug("Generating answer: question=%r, context=%d chars", question, len(context))
+        logger.debug("Context preview: %.500s", context)
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=self._answer_messages(question, context),
                 max_tokens=500,
                 temperature=0.1,
                 top_p=0.95
             )
-            
+
             return response.choices[0].message.content.strip()
-            
+
         except Exception as e:
             return f"Error generating answer: {str(e)}"
+
+    def answer_question_stream(self, question: str):
+        """
+        Stream an answer's tokens as they are generated
+
+        Yields text deltas so the caller can flush them to the client
+        incrementally - time-to-first-token instead of full LLM latency.
+        Validation failures yield a single explanatory message.
+        """
+        if not question or len(question.strip()) < 3:
+            yield "Please provide a valid question."
+            return
+
+        if not self.vector_store.vectors:
+            yield "No documents have been uploaded yet. Please upload a document first, then ask your question."
+            return
+
+        relevant_context = self._get_relevant_context(question)
+        if not relevant_context:
+            yield "I couldn't find relevant information in the uploaded documents to answer your question."
+            return
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._answer_messages(question, relevant_context),
+                max_tokens=500,
+                temperature=0.1,
+                top_p=0.95,
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            yield f"Error generating answer: {str(e)}"
     
     def _cleanup_user_documents(self, max_docs_per_user: int = 5):
         """Remove oldest documents for current user if they exceed the limit"""
-        if not self.user_id or not hasattr(self.vector_store, 'metadata'):
+        if not self.user_id:
             return
-            
-        # Get all user documents sorted by upload time
-        user_docs = []
-        for i, metadata in enumerate(self.vector_store.metadata):
-            if metadata.get('user_id') == self.user_id:
-                user_docs.append((i, metadata))
-        
-        # Group by document ID and get unique documents
-        doc_times = {}
-        for _, metadata in user_docs:
-            doc_id = metadata.get('doc_id')
-            upload_time = metadata.get('upload_time', '')
-            if doc_id and doc_id not in doc_times:
-                doc_times[doc_id] = upload_time
-        
+
+        # Per-user index avoids scanning all metadata rows
+        doc_times = {doc_id: info.get('upload_time') or ''
+                     for doc_id, info in self.vector_store.user_docs(self.user_id).items()}
+
         # If user has too many documents, remove oldest ones
         if len(doc_times) >= max_docs_per_user:
             sorted_docs = sorted(doc_times.items(), key=lambda x: x[1])  # Sort by time
@@ -453,24 +511,40 @@ Please answer the question based on the context provided above."""
             if i < len(self.vector_store.vectors):
                 self.vector_store.vectors.pop(i)
                 self.vector_store.metadata.pop(i)
+
+        # Row removal invalidates the append-only vector file layout and
+        # the per-user document index
+        if indices_to_remove:
+            self.vector_store._needs_full_rewrite = True
+            self.vector_store.rebuild_user_index()
         
         # Remove from documents list
         self.documents = [doc for doc in self.documents if doc.get('doc_id') != doc_id]
+        self._status_dirty = True
     
     def _count_user_documents(self) -> int:
         """Count unique documents for current user"""
-        if not self.user_id or not hasattr(self.vector_store, 'metadata'):
+        if not self.user_id:
             return 0
-            
-        user_doc_ids = set()
-        for metadata in self.vector_store.metadata:
-            if metadata.get('user_id') == self.user_id and metadata.get('doc_id'):
-                user_doc_ids.add(metadata['doc_id'])
-        
-        return len(user_doc_ids)
+        return len(self.vector_store.user_docs(self.user_id))
 
     def get_status(self) -> Dict[str, Any]:
-        """Get current status of the QA agent (filtered by user in multi-user mode)"""
+        """Get current status of the QA agent (filtered by user in multi-user mode)
+
+        The result is cached and only rebuilt after documents change
+        (add_document/clear_documents/_remove_document_by_id set the dirty
+        flag), so repeated calls on the question-answering path are O(1).
+        """
+        if not self._status_dirty and self._status_cache is not None:
+            return self._status_cache
+
+        status = self._build_status()
+        self._status_cache = status
+        self._status_dirty = False
+        return status
+
+    def _build_status(self) -> Dict[str, Any]:
+        """Rebuild the status dict by scanning the vector store"""
         vector_stats = self.vector_store.get_stats()
         
         # Count documents and chunks for current user
@@ -516,4 +590,5 @@ Please answer the question based on the context provided above."""
         self.documents = []
         self.vector_store.clear()
         self.vector_store.save()  # Save cleared state
+        self._status_dirty = True
         print("🗑️  Cleared all documents and vectors")
\ No newline at end of file
@@ -2,8 +2,8 @@ import os
 import tempfile
 import uuid
 from pathlib import Path
-from openai import OpenAI
 from typing import Optional
+from .openai_client import get_openai_client
 
 class Transcriber:
     """Agent responsible for audio transcription and text-to-speech"""
@@ -11,7 +11,7 @@ class Transcriber:
     def __init__(self):
         """Initialize the Transcriber with OpenAI client"""
         try:
-            self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.client = get_openai_client()
             self.audio_dir = Path('static/audio')
             self.audio_dir.mkdir(exist_ok=True)
             
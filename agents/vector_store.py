@@ -1,10 +1,18 @@
 import os
 import pickle
+import logging
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from .embeddings import Embedder
 
+# On-disk vector precision: fp16 halves the bytes moved on every load/save
+# with negligible recall loss for cosine similarity (numpy upcasts to fp32
+# during the dot products)
+DISK_VECTOR_DTYPE = np.float16
+
+logger = logging.getLogger(__name__)
+
 class VectorStore:
     """
     Simple vector store for embeddings using numpy and pickle
@@ -26,26 +34,51 @@ class VectorStore:
         self.vectors = []  # List of numpy arrays (embeddings)
         self.metadata = []  # List of metadata dicts for each vector
         self.dimension = None  # Embedding dimension (set on first embedding)
-        
+
+        # Cached contiguous (N, D) unit-normalized float32 matrix of all
+        # vectors; rebuilt lazily whenever the row count changes so search
+        # is one BLAS matvec instead of a Python loop of dot products
+        self._matrix = None
+
+        # Per-user document index {user_id: {doc_id: info}} kept in sync
+        # with metadata, so listing/counting/deleting a user's documents
+        # skips the O(total_chunks) metadata scan
+        self._user_doc_index = {}
+
+        # Incremental persistence state: how many rows are already in the
+        # sidecar vector file, and whether a structural change (clear or
+        # removal) forces a full rewrite of it on next save
+        self._saved_rows = 0
+        self._needs_full_rewrite = False
+        self._disk_dtype = DISK_VECTOR_DTYPE  # dtype of the sidecar file rows
+
         # Load existing data if available
         self.load()
-        
+
         print(f"✅ VectorStore initialized with {len(self.vectors)} vectors")
 
-    def add_text(self, text: str, metadata: Dict[str, Any]) -> str:
+    @property
+    def _vectors_path(self) -> Path:
+        """Sidecar file holding the raw float32 vector matrix"""
+        return self.persist_path.with_suffix('.vec')
+
+    def add_text(self, text: str, metadata: Dict[str, Any], embedding: Optional[List[float]] = None) -> str:
         """
         Add text to vector store by creating embedding
-        
+
         Args:
             text (str): Text to embed and store
             metadata (Dict): Associated metadata
-            
+            embedding (Optional[List[float]]): Precomputed embedding - when
+                provided (e.g. from a batched call), skips the per-text API hit
+
         Returns:
             str: Generated ID for the stored vector
         """
         try:
-            # Generate embedding
-            embedding = self.embedder.create_embedding(text)
+            # Generate embedding unless the caller already batched one
+            if embedding is None:
+                embedding = self.embedder.create_embedding(text)
             if embedding is None:
                 raise ValueError("Failed to create embedding")
             
@@ -69,9 +102,11 @@ class VectorStore:
                 **metadata
             }
             
-            # Store vector and metadata
-            self.vectors.append(vector)
+            # Store metadata before the vector: a search running in another
+            # thread only scores rows it can also read metadata for
             self.metadata.append(metadata_with_id)
+            self.vectors.append(vector)
+            self._index_row(metadata_with_id)
             
             print(f"➕ Added vector {vector_id} (total: {len(self.vectors)})")
             return vector_id
@@ -105,24 +140,29 @@ class VectorStore:
                 return []
             
             query_vector = np.array(query_embedding, dtype=np.float32)
-            
+
             # Validate dimension
             if len(query_vector) != self.dimension:
                 print(f"❌ Query embedding dimension mismatch: expected {self.dimension}, got {len(query_vector)}")
                 return []
-            
-            # Calculate cosine similarities (with optional user filtering)
+
+            # Cosine similarities against every stored vector in one BLAS
+            # matvec over the cached normalized matrix
+            query_norm = np.linalg.norm(query_vector)
+            query_unit = query_vector / query_norm if query_norm else query_vector
+            scores = self._stacked() @ query_unit
+
+            # Filter by user and threshold (with optional user filtering).
+            # The store is shared across request threads and the background
+            # embed task, so only walk rows that have both a score and a
+            # metadata entry - a concurrent append may be mid-flight.
             similarities = []
-            for i, stored_vector in enumerate(self.vectors):
+            for i in range(min(len(scores), len(self.metadata))):
+                similarity = scores[i]
                 # Skip vectors not belonging to the specified user
                 if user_id and self.metadata[i].get('user_id') != user_id:
                     continue
-                    
-                # Cosine similarity: dot product of normalized vectors
-                query_norm = query_vector / np.linalg.norm(query_vector)
-                stored_norm = stored_vector / np.linalg.norm(stored_vector)
-                similarity = np.dot(query_norm, stored_norm)
-                
+
                 if similarity >= min_similarity:
                     similarities.append({
                         'index': i,
@@ -134,9 +174,11 @@ class VectorStore:
             similarities.sort(key=lambda x: x['similarity'], reverse=True)
             results = similarities[:top_k]
             
-            print(f"🔍 Found {len(results)} similar vectors for query (top_k={top_k})")
-            for i, result in enumerate(results):
-                print(f"  {i+1}. Similarity: {result['similarity']:.3f} - {result['metadata']['text'][:50]}...")
+            logger.debug("Found %d similar vectors for query (top_k=%d)", len(results), top_k)
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, result in enumerate(results):
+                    logger.debug("  %d. Similarity: %.3f - %.50s...", i + 1,
+                                 result['similarity'], result['metadata']['text'])
             
             return results
             
@@ -144,6 +186,53 @@ class VectorStore:
             print(f"❌ Error in similarity search: {e}")
             return []
     
+    def _stacked(self) -> np.ndarray:
+        """Contiguous unit-normalized (N, D) float32 matrix of all vectors
+
+        Rebuilt only when the row count changes (append, removal, reload),
+        so repeated searches reuse one cache-friendly array instead of
+        re-normalizing a Python list of 1-D arrays per query.
+        """
+        if self._matrix is None or self._matrix.shape[0] != len(self.vectors):
+            matrix = np.asarray(self.vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1)
+            norms[norms == 0] = 1.0  # guard rows that would divide by zero
+            self._matrix = matrix / norms[:, None]
+        return self._matrix
+
+    def _index_row(self, metadata: Dict[str, Any]):
+        """Fold one metadata row into the per-user document index"""
+        user_id = metadata.get('user_id')
+        doc_id = metadata.get('doc_id')
+        if not user_id or not doc_id:
+            return
+        docs = self._user_doc_index.setdefault(user_id, {})
+        info = docs.get(doc_id)
+        if info is None:
+            docs[doc_id] = {
+                'doc_id': doc_id,
+                'title': metadata.get('doc_title', 'Untitled'),
+                'upload_time': metadata.get('upload_time'),
+                'chunk_count': 1
+            }
+        else:
+            info['chunk_count'] += 1
+
+    def rebuild_user_index(self):
+        """Rebuild the per-user document index from metadata
+
+        Needed after bulk mutations that bypass add_text (row removal,
+        direct metadata appends).
+        """
+        self._matrix = None  # row set changed - force a re-stack on next search
+        self._user_doc_index = {}
+        for metadata in self.metadata:
+            self._index_row(metadata)
+
+    def user_docs(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """O(1) view of a user's documents: {doc_id: info}"""
+        return self._user_doc_index.get(user_id, {})
+
     def get_by_id(self, vector_id: str) -> Optional[Dict[str, Any]]:
         """Get vector metadata by ID"""
         for metadata in self.metadata:
@@ -156,67 +245,135 @@ class VectorStore:
         self.vectors = []
         self.metadata = []
         self.dimension = None
+        self._matrix = None
+        self._user_doc_index = {}
+        self._needs_full_rewrite = True
         print("🗑️  Cleared vector store")
-    
+
     def save(self):
-        """Save vector store to disk"""
+        """Save vector store to disk
+
+        Vectors live in a sidecar raw float32 file that is appended to when
+        only new rows were added since the last save; the (much smaller)
+        metadata pickle is rewritten each time. Structural changes (clear,
+        document removal) trigger a full rewrite of the vector file.
+        """
         try:
             # Ensure parent directory exists
             self.persist_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            print(f"📁 Saving vector store to: {self.persist_path}")
-            print(f"📊 Data to save: {len(self.vectors)} vectors, {len(self.metadata)} metadata entries")
-            
-            data = {
-                'vectors': self.vectors,
-                'metadata': self.metadata,
-                'dimension': self.dimension
-            }
-            
+
             # Check if directory is writable
             if not os.access(self.persist_path.parent, os.W_OK):
                 print(f"❌ Directory {self.persist_path.parent} is not writable!")
                 print(f"📁 Directory permissions: {oct(os.stat(self.persist_path.parent).st_mode)[-3:]}")
                 return
-            
+
+            # A dtype change (e.g. migrating an fp32 file) forces a rewrite
+            # since appends must match the existing file layout
+            if self._disk_dtype != DISK_VECTOR_DTYPE:
+                self._needs_full_rewrite = True
+
+            vec_path = self._vectors_path
+
+            # Several instances can share one persist path (the production
+            # 'shared' store builds one VectorStore per user). If the file
+            # no longer holds exactly the rows this instance last saved,
+            # another writer got there first and appending would misalign
+            # vectors with our metadata pickle - fall back to a full,
+            # self-consistent rewrite of our own view instead.
+            if (not self._needs_full_rewrite and self.dimension
+                    and vec_path.exists()):
+                row_bytes = np.dtype(self._disk_dtype).itemsize * self.dimension
+                if vec_path.stat().st_size != self._saved_rows * row_bytes:
+                    self._needs_full_rewrite = True
+            if (self._needs_full_rewrite or self._saved_rows > len(self.vectors)
+                    or not vec_path.exists()):
+                # Full rewrite via temp file + atomic rename so any live
+                # memory maps of the old file stay valid
+                tmp_path = vec_path.with_suffix('.vec.tmp')
+                with open(tmp_path, 'wb') as f:
+                    for vector in self.vectors:
+                        f.write(np.asarray(vector, dtype=DISK_VECTOR_DTYPE).tobytes())
+                os.replace(tmp_path, vec_path)
+                self._needs_full_rewrite = False
+                print(f"📁 Rewrote vector file: {len(self.vectors)} rows")
+            elif len(self.vectors) > self._saved_rows:
+                # Append only the rows added since the last save
+                new_rows = self.vectors[self._saved_rows:]
+                with open(vec_path, 'ab') as f:
+                    for vector in new_rows:
+                        f.write(np.asarray(vector, dtype=DISK_VECTOR_DTYPE).tobytes())
+                print(f"📁 Appended {len(new_rows)} rows to vector file")
+            self._saved_rows = len(self.vectors)
+            self._disk_dtype = DISK_VECTOR_DTYPE
+
+            data = {
+                'metadata': self.metadata,
+                'dimension': self.dimension,
+                'vector_count': len(self.vectors),
+                'vector_dtype': np.dtype(DISK_VECTOR_DTYPE).name
+            }
             with open(self.persist_path, 'wb') as f:
                 pickle.dump(data, f)
-            
-            # Verify file was created and get size
-            if os.path.exists(self.persist_path):
-                file_size = os.path.getsize(self.persist_path)
-                print(f"✅ Successfully saved vector store to {self.persist_path}")
-                print(f"📦 File size: {file_size} bytes, {len(self.vectors)} vectors")
-            else:
-                print(f"❌ Vector store file was not created at {self.persist_path}")
-            
+
+            print(f"✅ Saved vector store to {self.persist_path} ({len(self.vectors)} vectors)")
+
         except Exception as e:
             print(f"❌ Error saving vector store: {e}")
             import traceback
             traceback.print_exc()
-    
+
     def load(self):
-        """Load vector store from disk"""
+        """Load vector store from disk
+
+        Vectors are memory-mapped from the sidecar file (zero-copy rows);
+        the legacy all-in-one pickle format is still read and migrated to
+        the sidecar layout on the next save.
+        """
         try:
             if not self.persist_path.exists():
                 print(f"📁 No existing vector store found at {self.persist_path}")
                 return
-            
+
             with open(self.persist_path, 'rb') as f:
                 data = pickle.load(f)
-            
-            self.vectors = data.get('vectors', [])
+
             self.metadata = data.get('metadata', [])
             self.dimension = data.get('dimension', None)
-            
+
+            legacy_vectors = data.get('vectors')
+            if legacy_vectors is not None:
+                # Old format: vectors embedded in the pickle - migrate on next save
+                self.vectors = legacy_vectors
+                self._saved_rows = 0
+                self._needs_full_rewrite = True
+            else:
+                count = data.get('vector_count', 0)
+                # Sidecar files written before quantization hold fp32 rows
+                self._disk_dtype = np.dtype(data.get('vector_dtype', 'float32'))
+                vec_path = self._vectors_path
+                if count and self.dimension and vec_path.exists():
+                    matrix = np.memmap(vec_path, dtype=self._disk_dtype, mode='r',
+                                       shape=(count, self.dimension))
+                    self.vectors = list(matrix)  # zero-copy row views
+                    self._saved_rows = count
+                else:
+                    self.vectors = []
+                    self._saved_rows = 0
+
+            self.rebuild_user_index()
             print(f"📂 Loaded vector store from {self.persist_path} ({len(self.vectors)} vectors)")
-            
+
         except Exception as e:
             print(f"❌ Error loading vector store: {e}")
             # Reset to empty state on load failure
             self.vectors = []
             self.metadata = []
             self.dimension = None
+            self._matrix = None
+            self._user_doc_index = {}
+            self._saved_rows = 0
+            self._needs_full_rewrite = False
     
     def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics"""
@@ -224,5 +381,6 @@ class VectorStore:
             'total_vectors': len(self.vectors),
             'dimension': self.dimension,
             'persist_path': str(self.persist_path),
+            'vector_dtype': np.dtype(self._disk_dtype).name,
             'memory_usage_mb': sum(vector.nbytes for vector in self.vectors) / (1024 * 1024) if self.vectors else 0
         }
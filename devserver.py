@@ -0,0 +1,42 @@
+"""Interactive development launcher.
+
+Holds the startup banner and app.run() so importing main (gunicorn,
+tests) never carries these strings in its bytecode or touches the dev
+server path. Run with `python main.py` or `python devserver.py`.
+"""
+import os
+import sys
+
+
+def run(app, openai_configured, agents_ready):
+    """Print the dev banner (unless quieted) and start the Werkzeug server"""
+    # One stdout write instead of ten separate line-buffered prints; set
+    # MYAIGIST_QUIET=1 to skip the banner entirely (e.g. piped CI logs)
+    if os.getenv('MYAIGIST_QUIET') != '1':
+        banner = "\n".join([
+            "🚀 Starting MyAIGist server...",
+            f"📁 Static folder: {app.static_folder}",
+            "🌐 Visit: http://localhost:8000",
+            "🔧 Debug info: http://localhost:8000/debug",
+            "💚 Health check: http://localhost:8000/health",
+            "📋 Summary levels: Quick, Standard (default), Detailed",
+            "📄 Supported content: Text input, PDF/DOCX/TXT documents",
+            "🎤 Voice features: Live recording for Q&A questions only",
+            f"🤖 OpenAI API configured: {openai_configured}",
+            f"🔧 All agents ready: {agents_ready}",
+        ])
+        sys.stdout.write(banner + "\n")
+        sys.stdout.flush()
+
+    # Debug mode (and the Werkzeug reloader, which doubles process memory
+    # by spawning a watcher child) only when explicitly requested;
+    # production runs go through gunicorn and never hit this path
+    debug = os.getenv('FLASK_DEBUG') == '1'
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+    app.run(debug=debug, use_reloader=debug, host='0.0.0.0',
+            port=int(os.getenv('PORT', '8000')))
+
+
+if __name__ == '__main__':
+    from main import app, _OPENAI_CONFIGURED, all_agents_ready
+    run(app, _OPENAI_CONFIGURED, all_agents_ready)
@@ -1,9 +1,24 @@
 # Gunicorn configuration for production deployment
+import os
+import multiprocessing
+
 bind = "0.0.0.0:8000"
-workers = 3
-worker_class = "sync"
+# Scale processes with the host instead of a fixed count
+workers = int(os.getenv('GUNICORN_WORKERS', str(2 * multiprocessing.cpu_count() + 1)))
+# gthread keeps requests on real threads, which is safe with preload_app:
+# the app imports ssl/threading and starts background threads at import
+# time, and gevent documents monkey-patching after that as unsupported
+# (intermittent TLS and lock breakage when patching happens post-fork).
+# Set GUNICORN_WORKER_CLASS=gevent to opt in to cooperative workers.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))  # used by gthread
 worker_connections = 1000
 timeout = 120
 max_requests = 1000
 max_requests_jitter = 50
-preload_app = True
+# Load the app (and agents) in the master before forking so workers share
+# agent state via copy-on-write instead of initializing it per worker.
+# gevent must patch before the app module is imported, so selecting it
+# gives up preloading (each worker imports the app itself, trading the
+# COW sharing for a patch-safe import order).
+preload_app = worker_class != 'gevent'
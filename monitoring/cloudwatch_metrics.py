@@ -1,22 +1,117 @@
 import os
+import time
+import atexit
 import boto3
 import json
+import functools
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+# CloudWatch resolves standard metrics to one second, so a fresh
+# datetime.utcnow() per metric buys nothing - reuse one timestamp per second
+_ts_cache = (0, None)  # (epoch second, datetime)
+
+def _utc_timestamp() -> datetime:
+    """Current UTC time, cached at one-second resolution"""
+    global _ts_cache
+    now = int(time.time())
+    if _ts_cache[0] != now:
+        _ts_cache = (now, datetime.utcnow().replace(microsecond=0))
+    return _ts_cache[1]
+
+@functools.lru_cache(maxsize=256)
+def _dimension_list(items: tuple) -> list:
+    """Convert sorted (name, value) pairs into the AWS Dimensions shape
+
+    The tracking helpers reuse a small set of dimension combinations, so
+    the converted lists are memoized instead of rebuilt per metric.
+    """
+    return [{'Name': k, 'Value': v} for k, v in items]
+
 class CloudWatchMetrics:
-    """Service for sending custom metrics to AWS CloudWatch"""
-    
+    """Service for sending custom metrics to AWS CloudWatch
+
+    Metrics are buffered in memory and flushed by a background thread,
+    either on an interval or when enough have accumulated. A single
+    put_metric_data accepts up to 1000 entries, so one tracked user
+    action (2-3 metrics) no longer costs 2-3 serial HTTP round trips.
+    """
+
+    _FLUSH_INTERVAL = 10   # seconds between background flushes
+    _FLUSH_THRESHOLD = 20  # buffered metrics that trigger an early flush
+    _MAX_BUFFER = 10000    # drop metrics past this to bound memory
+    _MAX_BATCH = 1000      # CloudWatch's MetricData limit per call
+
     def __init__(self):
         """Initialize CloudWatch client"""
+        self._buffer = []  # list of (namespace, metric_data)
+        self._dropped = 0  # metrics discarded because the buffer was full
+        self._lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._flusher_pid = None  # process that owns the running flush thread
         try:
             self.cloudwatch = boto3.client('cloudwatch', region_name=os.getenv('AWS_REGION', 'us-east-1'))
             self.namespace = 'MyAIGist/UserBehavior'
             self.resource_namespace = 'MyAIGist/Infrastructure'
+            self._ensure_flusher()
+            # Push out whatever is buffered when the process exits - gunicorn
+            # recycles workers every max_requests, and atexit registrations
+            # are inherited across fork, so recycled workers flush too
+            atexit.register(self.flush)
             print("✅ CloudWatch metrics service initialized successfully")
         except Exception as e:
             print(f"⚠️ CloudWatch metrics initialization failed: {e}")
             self.cloudwatch = None
+
+    def _ensure_flusher(self):
+        """Start the flush thread for the current process if it isn't running
+
+        Under gunicorn with preload_app the service is constructed in the
+        master; forked workers inherit the buffer but not the thread, so
+        every buffering call re-checks by PID and respawns the flusher in
+        its own process on first use.
+        """
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def _flush_loop(self):
+        """Flush buffered metrics on an interval or when signalled"""
+        while True:
+            self._flush_event.wait(self._FLUSH_INTERVAL)
+            self._flush_event.clear()
+            self.flush()
+
+    def flush(self):
+        """Send all buffered metrics, batched per namespace"""
+        with self._lock:
+            buffered, self._buffer = self._buffer, []
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            print(f"⚠️ Dropped {dropped} metrics (buffer full)")
+        if not buffered:
+            return
+
+        by_namespace = {}
+        for namespace, metric_data in buffered:
+            by_namespace.setdefault(namespace, []).append(metric_data)
+
+        for namespace, metric_list in by_namespace.items():
+            for start in range(0, len(metric_list), self._MAX_BATCH):
+                try:
+                    self.cloudwatch.put_metric_data(
+                        Namespace=namespace,
+                        MetricData=metric_list[start:start + self._MAX_BATCH]
+                    )
+                except Exception as e:
+                    print(f"❌ Error flushing {len(metric_list)} metrics to {namespace}: {e}")
+
+        print(f"📊 Flushed {len(buffered)} metrics to CloudWatch")
     
     def send_metric(self, metric_name: str, value: float, unit: str = 'Count', 
                    dimensions: Optional[Dict[str, str]] = None, namespace: str = None) -> bool:
@@ -41,24 +136,27 @@ class CloudWatchMetrics:
                 'MetricName': metric_name,
                 'Value': value,
                 'Unit': unit,
-                'Timestamp': datetime.utcnow()
+                'Timestamp': _utc_timestamp()
             }
-            
+
             if dimensions:
-                metric_data['Dimensions'] = [
-                    {'Name': k, 'Value': v} for k, v in dimensions.items()
-                ]
-            
-            self.cloudwatch.put_metric_data(
-                Namespace=namespace or self.namespace,
-                MetricData=[metric_data]
-            )
-            
-            print(f"📊 Sent metric: {metric_name}={value} {unit}")
+                metric_data['Dimensions'] = _dimension_list(tuple(sorted(dimensions.items())))
+
+            self._ensure_flusher()
+            with self._lock:
+                # If the flusher can't keep up (AWS outage, throttling),
+                # shed metrics rather than grow without bound
+                if len(self._buffer) >= self._MAX_BUFFER:
+                    self._dropped += 1
+                    return False
+                self._buffer.append((namespace or self.namespace, metric_data))
+                trigger_flush = len(self._buffer) >= self._FLUSH_THRESHOLD
+            if trigger_flush:
+                self._flush_event.set()
             return True
-            
+
         except Exception as e:
-            print(f"❌ Error sending metric {metric_name}: {e}")
+            print(f"❌ Error buffering metric {metric_name}: {e}")
             return False
     
     def track_content_processed(self, content_type: str, summary_level: str, 
@@ -703,10 +703,16 @@ class MyAIGist {
                 summary_number: this.summariesGenerated
             });
 
-            // Phase 1: Show summary immediately
+            // Phase 1: Show summary immediately; audio and Q&A indexing
+            // finish in a background task we poll for
             this.showSummary(result.summary, null, this.selectedSummaryLevel);
             this.showQASection();
-            this.showStatus(`Content processed successfully! You can now ask questions.`, 'success');
+            if (result.task_id) {
+                this.showStatus(`Summary ready! Preparing Q&A in the background...`, 'success');
+                this.pollContentTask(result.task_id, result.qa_skip_reason);
+            } else {
+                this.showStatus(`Content processed successfully! You can now ask questions.`, 'success');
+            }
             
             // Phase 2: Generate audio in background
             if (result.summary && result.summary.trim().length > 10) {
@@ -726,16 +732,45 @@ class MyAIGist {
                 }, 1000);
             }
 
-            // Clear inputs and refresh
+            // Clear inputs (the document list refreshes when the background
+            // task reports qa_stored)
             this.clearAllInputs();
-            if (result.qa_stored) {
-                setTimeout(() => this.loadUserDocuments(), 1000);
-            }
         } else {
             throw new Error(result.error || 'Processing failed');
         }
     }
 
+    async pollContentTask(taskId, qaSkipReason) {
+        // Poll the background TTS/embedding task so the UI only announces
+        // Q&A readiness (and refreshes the document list) once the upload
+        // is actually indexed. Every terminal state replaces the
+        // "Preparing Q&A..." status so the user is never left waiting.
+        for (let attempt = 0; attempt < 40; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 1500));
+            try {
+                const response = await fetch(`/api/task/${taskId}`);
+                if (!response.ok) return;
+                const task = await response.json();
+                if (task.status === 'done' || task.status === 'error') {
+                    if (task.qa_stored) {
+                        this.showStatus(`Content processed successfully! You can now ask questions.`, 'success');
+                        this.loadUserDocuments();
+                    } else if (qaSkipReason === 'too_short') {
+                        this.showStatus(`Summary ready! Text was too short to index for Q&A.`, 'success');
+                    } else if (task.status === 'error' || task.qa_stored === false) {
+                        this.showStatus(`Summary ready, but Q&A indexing failed. Try uploading again to ask questions.`, 'error');
+                    } else {
+                        this.showStatus(`Summary ready! This content was not indexed for Q&A.`, 'success');
+                    }
+                    return;
+                }
+            } catch (error) {
+                console.error('❌ Task polling failed:', error);
+                return;
+            }
+        }
+    }
+
     async processMultipleInputs() {
         // Use the existing multi-file upload logic but adapted for mixed inputs
         console.log('📁 Processing multiple inputs...');
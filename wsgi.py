@@ -0,0 +1,12 @@
+"""WSGI entry point for production servers.
+
+Launch with gunicorn (workers/worker class come from gunicorn.conf.py):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Running main.py directly remains the interactive development path.
+"""
+from main import app
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=8000)